@@ -2,26 +2,30 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.model import JsonModel
+from functools import lru_cache
+import orjson
 import os
 import json
 
 # Full-access Gmail API scope
 SCOPES = ['https://www.googleapis.com/auth/gmail.modify']
 
+# Decodes API responses with orjson, which is several times faster than json.loads on large messages
+class OrjsonModel(JsonModel):
+    def deserialize(self, content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Same fallback as JsonModel for bodies that are not JSON
+            return content.decode('utf-8') if isinstance(content, bytes) else content
+
+
 def authenticate_google(token_path='token.json', credentials_path='credentials.json'):
 
-    creds = None
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(token_path, 'w') as token:
-            token.write(creds.to_json())
-    return build('gmail', 'v1', credentials=creds)
+    creds = get_and_save_token(SCOPES, credentials_path=credentials_path, token_path=token_path)
+    # Use the discovery document bundled with the client instead of fetching it
+    return build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False, model=OrjsonModel())
 
 
 def get_and_save_token(scopes=['https://www.googleapis.com/auth/gmail.modify'], credentials_path='credentials.json', token_path='token.json'):
@@ -43,5 +47,11 @@ def get_and_save_token(scopes=['https://www.googleapis.com/auth/gmail.modify'],
     return creds
 
 
+@lru_cache(maxsize=1)
+def get_service():
+    # One Gmail client shared by every module that needs it
+    return authenticate_google()
+
+
 if __name__=="__main__":
     get_and_save_token()
\ No newline at end of file
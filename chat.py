@@ -1,33 +1,101 @@
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_google_genai import ChatGoogleGenerativeAI
-from gmail_tools import (
-    fetch_top_email,
-    fetch_specific_email,
-    reply_to_email,
-    list_emails,
-    get_email_id,
-    send_email
-)
-from auth import authenticate_google, get_and_save_token
 from dotenv import load_dotenv
 load_dotenv()
 import os
+import asyncio
 
-service = authenticate_google()
+# Messages kept per conversation, older turns are dropped
+MAX_HISTORY_MESSAGES = 20
 
-# Load LLM
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-)
+# Graph steps per turn; each tool round costs a pre-model hook step, a model step and a tools step,
+# so this leaves room for about eight rounds before a runaway loop is stopped
+RECURSION_LIMIT = 25
 
-memory = MemorySaver()
+# Conversation checkpoints; a session's thread cannot be resumed once its page is gone
+CHECKPOINT_DB = "checkpoints.db"
 
-# ReAct Agent
-graph = create_react_agent(
-    model=llm,
-    tools=[fetch_top_email, fetch_specific_email, reply_to_email, list_emails, get_email_id, send_email],
-    checkpointer=memory
-)
+_graph = None
+_memory = None
+_graph_lock = asyncio.Lock()
 
-get_and_save_token()
+async def get_graph():
+    # Built on first use inside the running event loop, which AsyncSqliteSaver requires
+    global _graph
+    async with _graph_lock:
+        if _graph is None:
+            # The first import of the agent stack takes seconds; load it on a worker thread so other sessions keep streaming
+            await asyncio.to_thread(_load_graph_modules)
+            _graph = _build_graph()
+    return _graph
+
+async def delete_session(thread_id):
+    # Drop the checkpoints of a conversation the user cleared
+    if _memory is not None:
+        await _memory.adelete_thread(thread_id)
+
+def reset_checkpoints():
+    # Session ids live only in the browser page, so after a restart no stored thread can be resumed
+    for path in (CHECKPOINT_DB, f"{CHECKPOINT_DB}-wal", f"{CHECKPOINT_DB}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def _load_graph_modules():
+    # Importing fills sys.modules, so the imports in _build_graph are cheap afterwards
+    import langgraph.prebuilt
+    import langgraph.checkpoint.sqlite.aio
+    import langchain_google_genai
+    import gmail_tools
+
+def _build_graph():
+    # Deferred until the first chat so importing this module stays cheap
+    from langgraph.prebuilt import create_react_agent
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    from langgraph.graph.message import REMOVE_ALL_MESSAGES
+    from langchain_core.messages import HumanMessage, RemoveMessage, trim_messages
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from gmail_tools import (
+        fetch_top_email,
+        fetch_specific_email,
+        reply_to_email,
+        list_emails,
+        get_email_id,
+        send_email
+    )
+    import aiosqlite
+
+    # Load LLM
+    llm = ChatGoogleGenerativeAI(
+        model="gemini-2.0-flash",
+        streaming=True,
+    )
+
+    def trim_history(state):
+        # Replace the stored history with its most recent turns so both the checkpoint and the prompt stay bounded
+        messages = trim_messages(
+            state["messages"],
+            strategy="last",
+            token_counter=len,
+            max_tokens=MAX_HISTORY_MESSAGES,
+            start_on="human",
+            include_system=True
+        )
+        if not messages:
+            # The current turn alone is longer than the limit; keep it whole from the user's message onward
+            last_human = max(
+                (i for i, message in enumerate(state["messages"]) if isinstance(message, HumanMessage)),
+                default=0
+            )
+            messages = state["messages"][last_human:]
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *messages]}
+
+    # Checkpoints live on disk (the saver switches the database to WAL) instead of in an ever-growing dict.
+    # The frontend runs the graph asynchronously, so the async saver is required.
+    global _memory
+    _memory = AsyncSqliteSaver(aiosqlite.connect(CHECKPOINT_DB, check_same_thread=False))
+
+    # ReAct Agent, with the number of reasoning/tool steps per turn bounded
+    return create_react_agent(
+        model=llm,
+        tools=[fetch_top_email, fetch_specific_email, reply_to_email, list_emails, get_email_id, send_email],
+        checkpointer=_memory,
+        pre_model_hook=trim_history
+    ).with_config({"recursion_limit": RECURSION_LIMIT})
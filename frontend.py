@@ -1,14 +1,34 @@
 import gradio as gr
-from chat import graph
+import uuid
+from auth import get_service
+from chat import get_graph, delete_session, reset_checkpoints
 
-def chat_interface(user_input, history):
+async def chat_interface(user_input, history, session_id):
+    history.append((user_input, ""))
     try:
-        response = graph.invoke({"messages": ("user", user_input)}, config={"configurable": {"thread_id": "09042004"}})['messages'][-1].content
-        history.append((user_input, response))
-        return history, ""
+        graph = await get_graph()
+        # Stream the reply token by token instead of waiting for the whole answer
+        async for event in graph.astream_events(
+            {"messages": ("user", user_input)},
+            config={"configurable": {"thread_id": session_id}},
+            version="v2"
+        ):
+            if event["event"] == "on_chat_model_start":
+                # Each ReAct step is a new model call; show only the text of the latest one
+                history[-1] = (user_input, "")
+            elif event["event"] == "on_chat_model_stream":
+                token = event["data"]["chunk"].content
+                if token and isinstance(token, str):
+                    history[-1] = (user_input, history[-1][1] + token)
+                    yield history, ""
     except Exception as e:
-        history.append((user_input, f"[ERROR] {str(e)}"))
-        return history, ""
+        history[-1] = (user_input, f"[ERROR] {str(e)}")
+    yield history, ""
+
+async def clear_chat(session_id):
+    # Forget the old conversation and start a new one
+    await delete_session(session_id)
+    return [], "", [], uuid.uuid4().hex
 
 
 with gr.Blocks() as demo:
@@ -20,10 +40,15 @@ with gr.Blocks() as demo:
     clear_btn = gr.Button("Clear Chat")
 
     state = gr.State([])
+    # Each browser session gets its own conversation checkpoint
+    session_id = gr.State(lambda: uuid.uuid4().hex)
 
-    msg.submit(chat_interface, [msg, state], [chatbot, msg])
-    clear_btn.click(lambda: ([], ""), None, [chatbot, msg])
+    msg.submit(chat_interface, [msg, state, session_id], [chatbot, msg], queue=True)
+    clear_btn.click(clear_chat, [session_id], [chatbot, msg, state, session_id])
 
 
 if __name__ == "__main__":
+    # Authenticate before serving, so the OAuth flow never blocks the event loop mid-chat
+    get_service()
+    reset_checkpoints()
     demo.launch(share=False)
@@ -1,10 +1,221 @@
-from langchain_core.tools import tool
-from typing import Optional, List, Dict, Any, Union
-from auth import authenticate_google
+from langchain_core.tools import tool, StructuredTool
+from google.auth.transport.requests import Request
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+from typing import Optional, List, Dict, Any, Union, Tuple
+from pydantic import BaseModel
+from auth import get_service
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+import google_auth_httplib2
+import httplib2
+import threading
+import asyncio
+import httpx
+import orjson
+import base64
+import binascii
+import re
+import sys
+from email.header import Header
 
-service = authenticate_google()
+service = get_service()
 
-@tool
+# httplib2.Http is not thread-safe. Sync tools run on executor threads (several at once when the
+# agent issues parallel tool calls), so every API call executes on its thread's own Http instance
+_thread_local = threading.local()
+
+def _thread_http() -> google_auth_httplib2.AuthorizedHttp:
+    """
+    Returns the authorized Http instance of the current thread, creating it on first use.
+    """
+    if not hasattr(_thread_local, 'http'):
+        _thread_local.http = google_auth_httplib2.AuthorizedHttp(service._http.credentials, http=httplib2.Http())
+    return _thread_local.http
+
+# Gmail rejects batch requests with more than 100 calls
+BATCH_LIMIT = 100
+
+# Parallel fallback fetches, kept low to stay under Gmail's per-user rate limit
+FETCH_WORKERS = 10
+
+# Retries (with exponential backoff) for rate-limited or failed fallback fetches
+FETCH_RETRIES = 3
+
+# Failures of a Gmail API call itself (HTTP status or network); anything else is a bug and must surface
+REQUEST_ERRORS = (HttpError, TransportError, httplib2.HttpLib2Error, OSError)
+
+GMAIL_API_URL = "https://gmail.googleapis.com/gmail/v1/users/me"
+
+# Headers requested for metadata-only fetches
+METADATA_HEADERS = ['Subject', 'From', 'Date', 'Message-ID']
+
+# Partial responses: only the fields the tools actually read are sent back
+LIST_FIELDS = 'messages(id,threadId),nextPageToken'
+METADATA_FIELDS = 'id,threadId,labelIds,snippet,payload/headers'
+FULL_FIELDS = 'id,threadId,payload/headers,payload/parts(mimeType,body/data),payload/body/data'
+
+# Bound once so the hot paths skip the base64 attribute lookup
+_b64encode = base64.urlsafe_b64encode
+
+# Maps the URL-safe base64 alphabet back to the standard one
+_URLSAFE_TO_STD = bytes.maketrans(b'-_', b'+/')
+
+# Parsed messages keyed by (message id, format); entries expire so label changes show up again
+_message_cache = TTLCache(maxsize=512, ttl=600)
+# TTLCache is not thread-safe; tools run on executor threads while the async path runs on the event loop
+_cache_lock = threading.Lock()
+
+# Lowercased names of the headers the tools read, interned so lookups compare by identity
+WANTED_HEADERS = frozenset(map(sys.intern, ('subject', 'from', 'date', 'message-id')))
+
+_lower = str.lower
+
+def _extract_headers(payload: Dict[str, Any], wanted: frozenset = WANTED_HEADERS) -> Dict[str, str]:
+    """
+    Collects the wanted headers in a single pass, keyed by lowercased header name.
+    The first occurrence wins when a header is repeated.
+    """
+    out = {}
+    for header in payload.get('headers', []):
+        name = _lower(header['name'])
+        if name in wanted and name not in out:
+            out[sys.intern(name)] = header['value']
+    return out
+
+def _decode_body(data: str) -> str:
+    """
+    Decodes a URL-safe base64 message body, adding the padding Gmail may leave out.
+    """
+    raw = data.encode('ascii').translate(_URLSAFE_TO_STD)
+    raw += b'=' * (-len(raw) % 4)
+    return binascii.a2b_base64(raw).decode('utf-8', 'replace')
+
+# RFC 5322 limit for a line, excluding the CRLF
+MAX_LINE_OCTETS = 998
+
+_NEWLINE = re.compile(r'\r\n?|\n')
+
+def _clean(value: str) -> str:
+    """
+    Folds a header value onto one line, since a line break inside it would start a new header.
+    """
+    return ' '.join(value.splitlines())
+
+def _rfc822(to: str, subject: str, body: str, cc: Optional[str] = None, bcc: Optional[str] = None, refs: Optional[str] = None) -> bytes:
+    """
+    Assembles a plain-text RFC 822 message without going through the email.mime machinery.
+    """
+    subject = _clean(subject)
+    if not subject.isascii():
+        subject = Header(subject, 'utf-8').encode(linesep='\r\n')
+    
+    lines = [
+        f"To: {_clean(to)}",
+        f"Subject: {subject}",
+        "MIME-Version: 1.0",
+        "Content-Type: text/plain; charset=utf-8"
+    ]
+    if cc:
+        lines.append(f"Cc: {_clean(cc)}")
+    if bcc:
+        lines.append(f"Bcc: {_clean(bcc)}")
+    if refs:
+        lines += [f"References: {_clean(refs)}", f"In-Reply-To: {_clean(refs)}"]
+    
+    data = _NEWLINE.sub('\r\n', body).encode('utf-8')
+    if data.isascii() and all(len(line) <= MAX_LINE_OCTETS for line in data.split(b'\r\n')):
+        lines.append("Content-Transfer-Encoding: 7bit")
+    else:
+        # Non-ASCII text or over-long lines cannot be sent as-is; base64 keeps every line at 76 characters
+        lines.append("Content-Transfer-Encoding: base64")
+        data = base64.encodebytes(data).replace(b'\n', b'\r\n')
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('utf-8') + data
+
+def _parse_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extracts the fields used by the tools from a Gmail API message resource.
+    """
+    # Process the message to extract needed information
+    headers = _extract_headers(message['payload'])
+    
+    # Get email body
+    body = ""
+    if 'parts' in message['payload']:
+        for part in message['payload']['parts']:
+            if part['mimeType'] == 'text/plain':
+                body = part.get('body', {}).get('data', '')
+                if body:
+                    body = _decode_body(body)
+                break
+    elif 'body' in message['payload'] and 'data' in message['payload']['body']:
+        body = _decode_body(message['payload']['body']['data'])
+    
+    return {
+        "id": message['id'],
+        "thread_id": message.get('threadId', ''),
+        "subject": headers.get('subject', 'No Subject'),
+        "from": headers.get('from', 'Unknown'),
+        "date": headers.get('date', 'Unknown'),
+        "message_id": headers.get('message-id'),
+        "labels": message.get('labelIds', []),
+        "snippet": message.get('snippet', ''),
+        "body": body
+    }
+
+# Keys of a parsed message returned by the fetch tools and by list_emails
+EMAIL_KEYS = ('id', 'subject', 'from', 'date', 'body')
+SUMMARY_KEYS = ('id', 'thread_id', 'subject', 'from', 'date', 'labels', 'snippet')
+
+def _select(parsed: Dict[str, Any], keys) -> Dict[str, Any]:
+    """
+    Returns the given keys of a parsed message as a new dict, so cached entries are never handed out.
+    """
+    return {key: parsed[key] for key in keys}
+
+def _cache_get(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached parsed message for the key, or None.
+    """
+    with _cache_lock:
+        return _message_cache.get(key)
+
+def _cache_set(key: Tuple[str, str], parsed: Dict[str, Any]) -> None:
+    """
+    Stores a parsed message in the cache.
+    """
+    with _cache_lock:
+        _message_cache[key] = parsed
+
+def _get_parsed_message(msg_id: str, fmt: str = 'full') -> Dict[str, Any]:
+    """
+    Returns the parsed message, fetching it from Gmail only if it is not cached yet.
+    """
+    key = (msg_id, fmt)
+    parsed = _cache_get(key)
+    if parsed is None:
+        if fmt == 'metadata':
+            request = service.users().messages().get(
+                userId='me', id=msg_id, format='metadata', metadataHeaders=METADATA_HEADERS, fields=METADATA_FIELDS
+            )
+        else:
+            request = service.users().messages().get(userId='me', id=msg_id, format=fmt, fields=FULL_FIELDS)
+        parsed = _parse_message(request.execute(http=_thread_http()))
+        _cache_set(key, parsed)
+    return parsed
+
+def _invalidate_thread(thread_id: str) -> None:
+    """
+    Drops every cached message belonging to the given thread.
+    """
+    with _cache_lock:
+        for key in [key for key, parsed in _message_cache.items() if parsed['thread_id'] == thread_id]:
+            _message_cache.pop(key, None)
+
+class FetchTopEmailArgs(BaseModel):
+    pass
+
+@tool(args_schema=FetchTopEmailArgs, infer_schema=False)
 def fetch_top_email() -> Dict[str, Any]:
     """
     Fetches the latest email from the user's Gmail inbox.
@@ -16,47 +227,22 @@ def fetch_top_email() -> Dict[str, Any]:
         dict: A dictionary containing the email data with keys like 'id', 'subject', 'from', 'date', and 'body'.
     """
     try:
-        results = service.users().messages().list(userId='me', maxResults=1).execute()
+        results = service.users().messages().list(userId='me', maxResults=1, fields=LIST_FIELDS).execute(http=_thread_http())
         messages = results.get('messages', [])
         
         if not messages:
             return {"status": "error", "message": "No emails found"}
         
-        msg_id = messages[0]['id']
-        message = service.users().messages().get(userId='me', id=msg_id, format='full').execute()
-        
-        # Process the message to extract needed information
-        headers = message['payload']['headers']
-        subject = next((header['value'] for header in headers if header['name'].lower() == 'subject'), 'No Subject')
-        sender = next((header['value'] for header in headers if header['name'].lower() == 'from'), 'Unknown')
-        date = next((header['value'] for header in headers if header['name'].lower() == 'date'), 'Unknown')
-        
-        # Get email body
-        body = ""
-        if 'parts' in message['payload']:
-            for part in message['payload']['parts']:
-                if part['mimeType'] == 'text/plain':
-                    body = part.get('body', {}).get('data', '')
-                    import base64
-                    if body:
-                        body = base64.urlsafe_b64decode(body).decode('utf-8')
-                    break
-        elif 'body' in message['payload'] and 'data' in message['payload']['body']:
-            import base64
-            body = base64.urlsafe_b64decode(message['payload']['body']['data']).decode('utf-8')
+        email = _get_parsed_message(messages[0]['id'], 'full')
         
-        return {
-            "id": msg_id,
-            "subject": subject,
-            "from": sender,
-            "date": date,
-            "body": body,
-            "status": "success"
-        }
+        return _select(email, EMAIL_KEYS) | {"status": "success"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-@tool
+class FetchSpecificEmailArgs(BaseModel):
+    query: str
+
+@tool(args_schema=FetchSpecificEmailArgs, infer_schema=False)
 def fetch_specific_email(query: str) -> Dict[str, Any]:
     """
     Fetches the first email matching a given Gmail search query.
@@ -69,47 +255,23 @@ def fetch_specific_email(query: str) -> Dict[str, Any]:
         dict: A dictionary containing the email data with keys like 'id', 'subject', 'from', 'date', and 'body'.
     """
     try:
-        results = service.users().messages().list(userId='me', q=query, maxResults=1).execute()
+        results = service.users().messages().list(userId='me', q=query, maxResults=1, fields=LIST_FIELDS).execute(http=_thread_http())
         messages = results.get('messages', [])
         
         if not messages:
             return {"status": "error", "message": f"No emails found matching query: {query}"}
         
-        msg_id = messages[0]['id']
-        message = service.users().messages().get(userId='me', id=msg_id, format='full').execute()
-        
-        # Process the message to extract needed information
-        headers = message['payload']['headers']
-        subject = next((header['value'] for header in headers if header['name'].lower() == 'subject'), 'No Subject')
-        sender = next((header['value'] for header in headers if header['name'].lower() == 'from'), 'Unknown')
-        date = next((header['value'] for header in headers if header['name'].lower() == 'date'), 'Unknown')
-        
-        # Get email body
-        body = ""
-        if 'parts' in message['payload']:
-            for part in message['payload']['parts']:
-                if part['mimeType'] == 'text/plain':
-                    body = part.get('body', {}).get('data', '')
-                    import base64
-                    if body:
-                        body = base64.urlsafe_b64decode(body).decode('utf-8')
-                    break
-        elif 'body' in message['payload'] and 'data' in message['payload']['body']:
-            import base64
-            body = base64.urlsafe_b64decode(message['payload']['body']['data']).decode('utf-8')
+        email = _get_parsed_message(messages[0]['id'], 'full')
         
-        return {
-            "id": msg_id,
-            "subject": subject,
-            "from": sender,
-            "date": date,
-            "body": body,
-            "status": "success"
-        }
+        return _select(email, EMAIL_KEYS) | {"status": "success"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-@tool
+class ReplyToEmailArgs(BaseModel):
+    email_id: str
+    reply_text: str
+
+@tool(args_schema=ReplyToEmailArgs, infer_schema=False)
 def reply_to_email(email_id: str, reply_text: str) -> Dict[str, Any]:
     """
     Sends a reply to a specific email.
@@ -123,44 +285,35 @@ def reply_to_email(email_id: str, reply_text: str) -> Dict[str, Any]:
     """
     try:
         # First, get the email we're replying to
-        message = service.users().messages().get(userId='me', id=email_id, format='metadata').execute()
+        original = _get_parsed_message(email_id, 'metadata')
         
         # Extract thread ID and email headers
-        thread_id = message['threadId']
-        headers = message['payload']['headers']
+        thread_id = original['thread_id']
         
         # Get necessary header information
-        subject = next((header['value'] for header in headers if header['name'].lower() == 'subject'), 'No Subject')
+        subject = original['subject']
         if not subject.startswith('Re:'):
             subject = f"Re: {subject}"
             
-        to_address = next((header['value'] for header in headers if header['name'].lower() == 'from'), None)
-        if not to_address:
+        to_address = original['from']
+        if to_address == 'Unknown':
             return {"status": "error", "message": "Could not determine recipient address"}
         
         # Get references and in-reply-to headers if they exist
-        references = next((header['value'] for header in headers if header['name'].lower() == 'message-id'), None)
+        references = original['message_id']
         
-        # Create email message
-        import base64
-        from email.mime.text import MIMEText
-        
-        message = MIMEText(reply_text)
-        message['to'] = to_address
-        message['subject'] = subject
-        
-        if references:
-            message['References'] = references
-            message['In-Reply-To'] = references
-        
-        # Encode the message
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        # Create and encode the email message
+        message = _rfc822(to_address, subject, reply_text, refs=references)
+        raw_message = _b64encode(message).decode('utf-8')
         
         # Send the message
         sent_message = service.users().messages().send(
             userId='me',
             body={'raw': raw_message, 'threadId': thread_id}
-        ).execute()
+        ).execute(http=_thread_http())
+        
+        # The thread gained a message, so cached entries for it are stale
+        _invalidate_thread(thread_id)
         
         return {
             "status": "success", 
@@ -170,8 +323,117 @@ def reply_to_email(email_id: str, reply_text: str) -> Dict[str, Any]:
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-@tool
-def list_emails(max_results: int = 5, query: str = "") -> List[Dict[str, Any]]:
+def _build_email_list(messages: List[Dict[str, Any]], responses: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Builds the list_emails result from the parsed metadata, keeping the order of the list() call.
+    """
+    email_list = []
+    
+    for message in messages:
+        email = responses.get(message['id'])
+        if email is None:
+            continue
+        
+        email_list.append(_select(email, SUMMARY_KEYS))
+    
+    return email_list
+
+# System labels that can be served from the label index instead of a query scan
+PROMOTABLE_LABELS = frozenset({'INBOX', 'UNREAD', 'STARRED', 'IMPORTANT', 'SENT', 'DRAFT'})
+
+_LABEL_TOKEN = re.compile(r'(?<!\S)label:([A-Za-z_]+)(?!\S)')
+
+# Query syntax that labelIds cannot express
+_UNPROMOTABLE_QUERY = re.compile(r'\bOR\b|[{}()"]')
+
+def _split_labels(query: str) -> Tuple[str, List[str]]:
+    """
+    Moves system label:XXX terms out of the query and returns (remaining query, label IDs).
+    Queries using OR, grouping or quotes are left untouched, since labelIds can only express AND.
+    """
+    if _UNPROMOTABLE_QUERY.search(query):
+        return query, []
+    label_ids = []
+    
+    def promote(match):
+        label = match.group(1).upper()
+        if label not in PROMOTABLE_LABELS:
+            return match.group(0)
+        label_ids.append(label)
+        return ''
+    
+    cleaned = ' '.join(_LABEL_TOKEN.sub(promote, query).split())
+    return cleaned, label_ids
+
+def _split_cached(messages: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Splits list() results into the parsed metadata already cached, keyed by ID, and the messages still to fetch.
+    """
+    responses = {}
+    missing = []
+    for message in messages:
+        cached = _cache_get((message['id'], 'metadata'))
+        if cached is None:
+            missing.append(message)
+        else:
+            responses[message['id']] = cached
+    return responses, missing
+
+def _store_metadata(msg_id: str, msg: Dict[str, Any], responses: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Parses a fetched metadata response, caches it and adds it to responses.
+    """
+    parsed = _parse_message(msg)
+    _cache_set((msg_id, 'metadata'), parsed)
+    responses[msg_id] = parsed
+
+def _fetch_metadata(msg_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+    """
+    Fetches the metadata headers of a single message on the calling thread.
+    Returns (message, None) on success or (None, error) if the request fails.
+    """
+    try:
+        return service.users().messages().get(
+            userId='me',
+            id=msg_id,
+            format='metadata',
+            metadataHeaders=METADATA_HEADERS,
+            fields=METADATA_FIELDS
+        ).execute(http=_thread_http(), num_retries=FETCH_RETRIES), None
+    except REQUEST_ERRORS as e:
+        return None, e
+
+def _finish(
+    messages: List[Dict[str, Any]],
+    missing: List[Dict[str, Any]],
+    responses: Dict[str, Dict[str, Any]],
+    errors: Dict[str, str]
+) -> List[Dict[str, Any]]:
+    """
+    Retries the messages the first pass could not fetch on a bounded thread pool, then builds the
+    list_emails result. Reports the last error if none of the messages to fetch came back, so an auth
+    error or sustained rate limiting does not look like an empty mailbox.
+    """
+    failed = [message for message in missing if message['id'] not in responses]
+    if failed:
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            fetched = list(executor.map(_fetch_metadata, [message['id'] for message in failed]))
+        for message, (msg, error) in zip(failed, fetched):
+            if error is None:
+                _store_metadata(message['id'], msg, responses)
+            else:
+                errors[message['id']] = str(error)
+    
+    if missing and not any(message['id'] in responses for message in missing):
+        return [{"status": "error", "message": errors.get(missing[-1]['id'], "Could not fetch any of the matching emails")}]
+    
+    return _build_email_list(messages, responses)
+
+class ListEmailsArgs(BaseModel):
+    max_results: int = 5
+    query: str = ""
+
+def _list_emails(max_results: int = 5, query: str = "") -> List[Dict[str, Any]]:
     """
     Lists emails from the user's inbox with optional filters.
     
@@ -184,46 +446,142 @@ def list_emails(max_results: int = 5, query: str = "") -> List[Dict[str, Any]]:
         list: A list of dictionaries, each containing email metadata.
     """
     try:
+        cleaned_query, label_ids = _split_labels(query)
         results = service.users().messages().list(
             userId='me', 
             maxResults=max_results,
-            q=query
-        ).execute()
+            q=cleaned_query,
+            labelIds=label_ids or None,
+            includeSpamTrash=False,
+            fields=LIST_FIELDS
+        ).execute(http=_thread_http())
         
         messages = results.get('messages', [])
         
         if not messages:
             return []
             
-        email_list = []
-        
-        for message in messages:
-            msg = service.users().messages().get(userId='me', id=message['id'], format='metadata').execute()
+        responses, missing = _split_cached(messages)
+        errors = {}
+        
+        # Queue every uncached metadata fetch into batch requests instead of one round trip per message
+        def collect(request_id, response, exception):
+            if exception is None:
+                _store_metadata(request_id, response, responses)
+            else:
+                errors[request_id] = str(exception)
+        
+        for start in range(0, len(missing), BATCH_LIMIT):
+            batch = service.new_batch_http_request(callback=collect)
+            for message in missing[start:start + BATCH_LIMIT]:
+                batch.add(
+                    service.users().messages().get(
+                        userId='me',
+                        id=message['id'],
+                        format='metadata',
+                        metadataHeaders=METADATA_HEADERS,
+                        fields=METADATA_FIELDS
+                    ),
+                    request_id=message['id']
+                )
+            try:
+                batch.execute(http=_thread_http())
+            except REQUEST_ERRORS:
+                # The whole batch failed; its messages are retried one by one by _finish
+                pass
+        
+        return _finish(messages, missing, responses, errors)
+    except Exception as e:
+        return [{"status": "error", "message": str(e)}]
+
+def _auth_headers() -> Dict[str, str]:
+    """
+    Returns the bearer token header of the shared Gmail service, refreshing the token if it expired.
+    """
+    creds = service._http.credentials
+    if not creds.valid:
+        creds.refresh(Request())
+    return {"Authorization": f"Bearer {creds.token}"}
+
+async def _aget(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    msg_id: str,
+    errors: Dict[str, str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetches the metadata headers of a single message, or None if the request fails.
+    The reason of a failure is recorded in errors.
+    """
+    params = [('format', 'metadata'), ('fields', METADATA_FIELDS)] + [('metadataHeaders', name) for name in METADATA_HEADERS]
+    async with semaphore:
+        try:
+            response = await client.get(f"{GMAIL_API_URL}/messages/{msg_id}", params=params)
+        except httpx.HTTPError as e:
+            errors[msg_id] = str(e)
+            return None
+    if response.status_code != 200:
+        errors[msg_id] = f"HTTP {response.status_code}: {response.text}"
+        return None
+    return orjson.loads(response.content)
+
+async def _alist_emails(max_results: int = 5, query: str = "") -> List[Dict[str, Any]]:
+    """
+    Async variant of list_emails that fetches every message concurrently.
+    """
+    try:
+        cleaned_query, label_ids = _split_labels(query)
+        # A token refresh is a blocking HTTP call, so it must not run on the event loop
+        headers = await asyncio.to_thread(_auth_headers)
+        # HTTP/2 multiplexes every request below over a single TLS connection
+        async with httpx.AsyncClient(http2=True, headers=headers) as client:
+            response = await client.get(
+                f"{GMAIL_API_URL}/messages",
+                params={
+                    'maxResults': max_results,
+                    'q': cleaned_query,
+                    'labelIds': label_ids,
+                    'includeSpamTrash': 'false',
+                    'fields': LIST_FIELDS
+                }
+            )
+            response.raise_for_status()
+            results = orjson.loads(response.content)
+            
+            messages = results.get('messages', [])
             
-            # Extract headers
-            headers = msg['payload']['headers']
-            subject = next((header['value'] for header in headers if header['name'].lower() == 'subject'), 'No Subject')
-            sender = next((header['value'] for header in headers if header['name'].lower() == 'from'), 'Unknown')
-            date = next((header['value'] for header in headers if header['name'].lower() == 'date'), 'Unknown')
+            if not messages:
+                return []
             
-            # Get labels
-            labels = msg.get('labelIds', [])
+            responses, missing = _split_cached(messages)
+            errors = {}
             
-            email_list.append({
-                "id": message['id'],
-                "thread_id": msg['threadId'],
-                "subject": subject,
-                "from": sender,
-                "date": date,
-                "labels": labels,
-                "snippet": msg.get('snippet', '')
-            })
-        
-        return email_list
+            # Bounded like the thread pool fallback to stay under Gmail's per-user rate limit
+            semaphore = asyncio.Semaphore(FETCH_WORKERS)
+            fetched = await asyncio.gather(*[_aget(client, semaphore, message['id'], errors) for message in missing])
+        
+        for message, msg in zip(missing, fetched):
+            if msg is not None:
+                _store_metadata(message['id'], msg, responses)
+        
+        # Rate-limited or failed fetches are retried with backoff on the thread pool, off the event loop
+        return await asyncio.to_thread(_finish, messages, missing, responses, errors)
     except Exception as e:
         return [{"status": "error", "message": str(e)}]
+
+list_emails = StructuredTool.from_function(
+    func=_list_emails,
+    coroutine=_alist_emails,
+    name="list_emails",
+    description=_list_emails.__doc__,
+    args_schema=ListEmailsArgs,
+    infer_schema=False
+)
     
-@tool
+class GetEmailIdArgs(BaseModel):
+    query: str
+
+@tool(args_schema=GetEmailIdArgs, infer_schema=False)
 def get_email_id(query: str) -> Dict[str, Any]:
     """
     Retrieves the ID of an email matching the given search query.
@@ -233,38 +591,33 @@ def get_email_id(query: str) -> Dict[str, Any]:
         query: A Gmail search query string (e.g., "from:amazon.com" or "subject:Invoice" or "from: Haaris Sharma").
         
     Returns:
-        dict: A dictionary containing the email ID and basic information, or error status.
+        dict: A dictionary containing the email 'id' and 'thread_id', or error status.
     """
     try:
         # Search for emails matching the query
-        results = service.users().messages().list(userId='me', q=query, maxResults=1).execute()
+        results = service.users().messages().list(userId='me', q=query, maxResults=1, fields=LIST_FIELDS).execute(http=_thread_http())
         messages = results.get('messages', [])
         
         if not messages:
             return {"status": "error", "message": f"No emails found matching query: {query}"}
         
-        # Get the ID of the first matching email
-        msg_id = messages[0]['id']
-        
-        # Fetch basic metadata about the email
-        message = service.users().messages().get(userId='me', id=msg_id, format='metadata').execute()
-        
-        # Extract header information
-        headers = message['payload']['headers']
-        sender = next((header['value'] for header in headers if header['name'].lower() == 'from'), 'Unknown')
-        date = next((header['value'] for header in headers if header['name'].lower() == 'date'), 'Unknown')
-        
+        # The list response already carries the ID and thread ID of the first matching email
         return {
             "status": "success",
-            "id": msg_id,
-            "thread_id": message.get('threadId', ''),
-            "from": sender,
-            "date": date,
+            "id": messages[0]['id'],
+            "thread_id": messages[0].get('threadId', ''),
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
     
-@tool
+class SendEmailArgs(BaseModel):
+    to: str
+    subject: str
+    body: str
+    cc: Optional[Union[str, List[str]]] = None
+    bcc: Optional[Union[str, List[str]]] = None
+
+@tool(args_schema=SendEmailArgs, infer_schema=False)
 def send_email(
     to: str, 
     subject: str, 
@@ -287,29 +640,15 @@ def send_email(
         dict: A status dictionary containing success/error information and the message ID if successful.
     """
     try:
-        # Import required libraries
-        import base64
-        from email.mime.text import MIMEText
-        
-        # Create the message
-        message = MIMEText(body)
-        message['to'] = to
-        message['subject'] = subject
-        
-        # Add CC recipients if provided
-        if cc:
-            if isinstance(cc, list):
-                cc = ", ".join(cc)
-            message['cc'] = cc
-            
-        # Add BCC recipients if provided
-        if bcc:
-            if isinstance(bcc, list):
-                bcc = ", ".join(bcc)
-            message['bcc'] = bcc
+        # Join CC/BCC recipients if provided as lists
+        if isinstance(cc, list):
+            cc = ", ".join(cc)
+        if isinstance(bcc, list):
+            bcc = ", ".join(bcc)
         
-        # Encode the message
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        # Create and encode the message
+        message = _rfc822(to, subject, body, cc=cc, bcc=bcc)
+        encoded_message = _b64encode(message).decode('utf-8')
         
         # Create the email payload
         create_message = {
@@ -320,7 +659,7 @@ def send_email(
         sent_message = service.users().messages().send(
             userId='me', 
             body=create_message
-        ).execute()
+        ).execute(http=_thread_http())
         
         return {
             "status": "success",